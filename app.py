@@ -1,58 +1,76 @@
 import streamlit as st
 import pandas as pd
 import os
-import glob
 import re
 from datetime import datetime
 from pathlib import Path
 import io
+import json
+import shutil
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import ahocorasick
+import openpyxl
+import xlsxwriter
+
+# calamine (Rust) parses xlsx several times faster than openpyxl; fall back to
+# pandas' default engine when python-calamine is not installed
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = None
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Parsed sheets are also kept on disk as Parquet so a restarted app does not
+# have to parse the folder again; skipped when pyarrow is not installed
+SHEET_CACHE_FOLDER = ".xlsx_cache" if HAS_PYARROW else None
+
+# Cells are scanned as Arrow strings so the name pattern runs on pyarrow's RE2
+# engine (linear time, no backtracking) rather than Python's re, whose
+# alternation slows down badly with long name lists
+TEXT_DTYPE = "string[pyarrow]" if HAS_PYARROW else str
+
+
+# Output columns; search results are passed around as {column: list of values}
+RESULT_COLUMNS = ['Searched_Name', 'Vidhansabha', 'Part_Number', 'Row_Number', 'Matched_Content']
+
+# Most parsed workbooks kept in memory; files of the current search are never evicted
+WORKBOOK_CACHE_MAX_ENTRIES = 1000
 
 
 class NameSearcher:
     """Name Search Tool reading from fixed folder"""
 
-    def __init__(self, excel_folder="nadiad_excel_database"):
+    def __init__(self, excel_folder="nadiad_excel_database", cache_folder=SHEET_CACHE_FOLDER):
         self.excel_folder = excel_folder
-
-    def extract_part_number(self, file_path):
-        """Extract part number from row 6 of the Excel file"""
-        try:
-            df = pd.read_excel(file_path, sheet_name=0, nrows=10, header=None, dtype=str)
-
-            if len(df) > 5:
-                row_6_data = df.iloc[5]
-
-                for cell in row_6_data:
-                    if pd.notna(cell):
-                        cell_str = str(cell)
-                        if ':' in cell_str:
-                            part_number = cell_str.split(':')[-1].strip()
-                            if part_number:
-                                return part_number
-
-            return "N/A"
-        except Exception as e:
-            return "Error"
-
-    def extract_vidhansabha(self, file_path):
-        """Extract Vidhansabha from row 7 of the Excel file"""
-        try:
-            df = pd.read_excel(file_path, sheet_name=0, nrows=10, header=None, dtype=str)
-
-            if len(df) > 6:
-                row_7_data = df.iloc[6]
-
-                for cell in row_7_data:
-                    if pd.notna(cell):
-                        cell_str = str(cell)
-                        if ':' in cell_str:
-                            vidhansabha = cell_str.split(':')[-1].strip()
-                            if vidhansabha:
-                                return vidhansabha
-
-            return "N/A"
-        except Exception as e:
-            return "Error"
+        self.cache_folder = cache_folder
+
+    def extract_labelled_value(self, row):
+        """Return the text after the last ':' of the first labelled cell in a row"""
+        cells = row.dropna().astype(str)
+        values = cells[cells.str.contains(':', regex=False)].str.rsplit(':', n=1).str[-1].str.strip()
+        values = values[values != '']
+        return values.iloc[0] if len(values) > 0 else "N/A"
+
+    def extract_part_number(self, df):
+        """Extract part number from row 6 of the first sheet (row 1 is the header of df)"""
+        if len(df) > 4:
+            return self.extract_labelled_value(df.iloc[4])
+        return "N/A"
+
+    def extract_vidhansabha(self, df):
+        """Extract Vidhansabha from row 7 of the first sheet (row 1 is the header of df)"""
+        if len(df) > 5:
+            return self.extract_labelled_value(df.iloc[5])
+        return "N/A"
 
     def extract_row_number(self, matched_content):
         """Extract the first number (before first space) from matched content"""
@@ -64,87 +82,363 @@ class NameSearcher:
             return parts[0]
         return ""
 
-    def search_single_excel_file(self, file_path, search_terms, search_names_map):
-        """Search for patterns in a single Excel file"""
-        results = []
-
+    def format_cell(self, value):
+        """Convert a raw openpyxl cell value to the string pandas would give with dtype=str"""
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
+
+    def read_sheets(self, file_path):
+        """Read every sheet of an Excel file as string DataFrames, row 1 being the header"""
+        if EXCEL_ENGINE is not None or not file_path.lower().endswith('.xlsx'):
+            return pd.read_excel(file_path, sheet_name=None, dtype=str, engine=EXCEL_ENGINE)
+
+        # Without calamine, stream the cells with openpyxl's read-only parser
+        # rather than going through pandas' per-column type conversion
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            excel_data = {}
+            for worksheet in workbook.worksheets:
+                rows = worksheet.iter_rows(values_only=True)
+                next(rows, None)
+                cells = [[self.format_cell(value) for value in row] for row in rows]
+
+                # The stored sheet dimension often runs past the data (formatted but
+                # empty rows); drop those trailing rows so they are never cached or scanned
+                while cells and all(value is None for value in cells[-1]):
+                    cells.pop()
+
+                excel_data[worksheet.title] = pd.DataFrame(cells, dtype=object)
+            return excel_data
+        finally:
+            workbook.close()
+
+    def sheet_cache_dir(self, file_path):
+        """Folder holding the Parquet copy of one Excel file's sheets"""
+        key = hashlib.md5(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_folder, key)
+
+    def file_digest(self, file_path):
+        """SHA-1 of a file's contents, read in chunks"""
+        digest = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load_cached_sheets(self, file_path, signature):
+        """Load sheets from the Parquet cache, or None if missing or out of date"""
+        cache_dir = self.sheet_cache_dir(file_path)
+        manifest_path = os.path.join(cache_dir, 'manifest.json')
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['signature'] != list(signature):
+                # A re-copied or touched file keeps its cache if the bytes did not change
+                if manifest.get('sha1') != self.file_digest(file_path):
+                    return None
+                manifest['signature'] = list(signature)
+                with open(manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+
+            return {
+                sheet_name: pd.read_parquet(os.path.join(cache_dir, f"sheet_{idx}.parquet"))
+                for idx, sheet_name in enumerate(manifest['sheets'])
+            }
+        except Exception:
+            return None
+
+    def save_cached_sheets(self, file_path, signature, excel_data):
+        """Write sheets to the Parquet cache; failures only cost a re-parse next time"""
+        cache_dir = self.sheet_cache_dir(file_path)
+        tmp_dir = f"{cache_dir}.tmp{os.getpid()}"
         try:
-            part_number = self.extract_part_number(file_path)
-            vidhansabha = self.extract_vidhansabha(file_path)
-            excel_data = pd.read_excel(file_path, sheet_name=None, dtype=str)
-
-            for sheet_name, df in excel_data.items():
-                for row_idx, row in df.iterrows():
-                    for col_idx, cell_value in enumerate(row):
-                        if pd.notna(cell_value):
-                            cell_str = str(cell_value)
-
-                            for pattern in search_terms:
-                                if re.search(pattern, cell_str):
-                                    row_number = self.extract_row_number(cell_str)
-                                    search_name = search_names_map.get(pattern, pattern)
-
-                                    results.append({
-                                        'Searched_Name': search_name,
-                                        'Vidhansabha': vidhansabha,
-                                        'Part_Number': part_number,
-                                        'Row_Number': row_number,
-                                        'Matched_Content': cell_str
-                                    })
-                                    break
-        except Exception as e:
-            st.error(f"Error reading {os.path.basename(file_path)}: {e}")
-
-        return results
-
-    def search_all_excel_files(self, search_terms, search_names_map, all_search_names):
-        """Search all Excel files in the fixed folder"""
-        excel_files = glob.glob(os.path.join(self.excel_folder, "*.xlsx")) + glob.glob(os.path.join(self.excel_folder, "*.xls"))
+            os.makedirs(tmp_dir, exist_ok=True)
+            for idx, df in enumerate(excel_data.values()):
+                # Parquet needs string column labels
+                df.rename(columns=str).to_parquet(
+                    os.path.join(tmp_dir, f"sheet_{idx}.parquet"), compression='zstd', index=False
+                )
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'path': os.path.abspath(file_path),
+                    'signature': list(signature),
+                    'sha1': self.file_digest(file_path),
+                    'sheets': list(excel_data)
+                }, f)
+
+            # Swap the finished folder in so readers never see a partial cache
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.replace(tmp_dir, cache_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def prune_sheet_cache(self, excel_files):
+        """Delete cached copies of Excel files that no longer exist on disk"""
+        try:
+            entries = list(os.scandir(self.cache_folder))
+        except OSError:
+            return
+
+        live_dirs = {os.path.basename(self.sheet_cache_dir(f)) for f in excel_files}
+        for entry in entries:
+            # Folders of listed files are current, and .tmp folders may still be being written
+            if entry.name in live_dirs or '.tmp' in entry.name or not entry.is_dir():
+                continue
+            try:
+                with open(os.path.join(entry.path, 'manifest.json'), encoding='utf-8') as f:
+                    source_path = json.load(f)['path']
+            except Exception:
+                source_path = None
+            if source_path is None or not os.path.exists(source_path):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def read_workbook(self, file_path):
+        """Parse an Excel file into (part_number, vidhansabha, sheets).
+
+        Runs inside a worker process, so read errors are raised to the caller
+        instead of being reported with st.error here.
+        """
+        excel_data = None
+        if self.cache_folder:
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            excel_data = self.load_cached_sheets(file_path, signature)
+
+        if excel_data is None:
+            excel_data = self.read_sheets(file_path)
+            if self.cache_folder:
+                self.save_cached_sheets(file_path, signature, excel_data)
+
+        # Header fields come from the first sheet already in memory, not a second read
+        first_sheet = next(iter(excel_data.values()))
+        part_number = self.extract_part_number(first_sheet)
+        vidhansabha = self.extract_vidhansabha(first_sheet)
+        return part_number, vidhansabha, excel_data
+
+    def search_single_excel_file(self, workbook, search_pattern, automaton, min_cell_length):
+        """Search for names in one parsed workbook using the prebuilt matchers.
+
+        search_pattern may be None (see build_search_pattern); cells are then
+        checked with the automaton alone.
+
+        Returns parallel lists (searched_names, row_numbers, matched_contents);
+        the part number and Vidhansabha are the same for every match in a file.
+        """
+        searched_names = []
+        row_numbers = []
+        matched_contents = []
+        part_number, vidhansabha, excel_data = workbook
+
+        for sheet_name, df in excel_data.items():
+            # Skip columns that are empty or whose longest cell is too short to
+            # contain any search term; they cannot contain a match
+            text_columns = [col for col in df.columns if df[col].str.len().max() >= min_cell_length]
+            if not text_columns:
+                continue
+            df = df[text_columns]
+
+            # Flatten row by row so matches keep the sheet's reading order
+            values = df.to_numpy(dtype=object).ravel()
+            values = values[pd.notna(values)]
+
+            # Casefold the whole sheet in one call. Cells are joined with NUL, which
+            # cannot occur in xlsx cell text, so the result splits back per cell.
+            folded_text = "\x00".join(values).casefold()
+
+            # Most sheets contain none of the names: one automaton pass over the
+            # folded sheet text rules them out before any per-cell work
+            if next(automaton.iter(folded_text), None) is None:
+                continue
+
+            folded_cells = folded_text.split("\x00")
+            if len(folded_cells) != len(values):
+                folded_cells = [cell_str.casefold() for cell_str in values]
+
+            if search_pattern is None:
+                # Name list too large for a single pattern: the automaton checks every cell
+                candidate_indices = range(len(folded_cells))
+            else:
+                # Cheap pre-filter on the folded cells; the terms are casefolded too,
+                # so a plain case-sensitive match is enough
+                candidates = pd.Series(folded_cells, dtype=TEXT_DTYPE).str.contains(search_pattern)
+                candidate_indices = candidates.to_numpy(dtype=bool).nonzero()[0]
+
+            for idx in candidate_indices:
+                # Confirm with the automaton and credit the earliest name in input order
+                hits = [value for _, value in automaton.iter(folded_cells[idx])]
+                if not hits:
+                    continue
+
+                cell_str = values[idx]
+                searched_names.append(min(hits)[1])
+                row_numbers.append(self.extract_row_number(cell_str))
+                matched_contents.append(cell_str)
+
+        return searched_names, row_numbers, matched_contents
+
+    def search_all_excel_files(self, search_terms, search_names_map, all_search_names, excel_files=None,
+                               first_match_only=False):
+        """Search all Excel files in the fixed folder (or the given list of files).
+
+        With first_match_only, each name keeps only its first match and the scan
+        stops as soon as every name has been found. The file count returned is
+        the number of files actually scanned.
+        """
+        if excel_files is None:
+            excel_files = list_excel_files(self.excel_folder, os.path.getmtime(self.excel_folder))
 
         if not excel_files:
-            return None, f"No Excel files found in '{self.excel_folder}' folder"
-
-        all_results = []
+            return None, None, f"No Excel files found in '{self.excel_folder}' folder"
+
+        search_pattern, automaton = get_matchers(search_terms, search_names_map)
+        # Cells are matched after casefolding, which turns one character into at
+        # most three (e.g. "ß" -> "ss"), so a raw cell needs only a third of the
+        # shortest term's length to possibly match
+        min_cell_length = -(-min(len(term) for term in search_terms) // 3)
+        # Names that differ only by case share one term, so only the first can be found
+        findable_names = set(search_names_map.values())
+
+        # Results are kept column-wise: one list per output column
+        all_results = {column: [] for column in RESULT_COLUMNS}
+        # Summary counts are kept while scanning so no later pass over the results is needed;
+        # unread_files lists the files that failed to parse and are missing from the results
+        match_counts = {'by_name': Counter(), 'by_part': Counter(), 'unread_files': []}
         found_names = set()
         progress_placeholder = st.empty()
 
-        for idx, file_path in enumerate(excel_files):
-            filename = os.path.basename(file_path)
-            progress_placeholder.text(f"📄 Searching: {filename}... ({idx + 1}/{len(excel_files)})")
-
-            file_results = self.search_single_excel_file(file_path, search_terms, search_names_map)
-            all_results.extend(file_results)
-
-            for result in file_results:
-                found_names.add(result['Searched_Name'])
+        # Parsing dominates the search, so parsed workbooks are kept between
+        # searches and only new or modified files are read again
+        # The cache is shared by all sessions, so every change to it holds the lock
+        workbook_cache = get_workbook_cache()
+        cache_lock = get_workbook_cache_lock()
+        signatures = {}
+        for file_path in excel_files:
+            stat = os.stat(file_path)
+            signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+        stale_files = [f for f in excel_files if workbook_cache.get(f, (None,))[0] != signatures[f]]
+
+        # Drop files that were deleted from disk so their sheets are not kept forever
+        with cache_lock:
+            cached_paths = list(workbook_cache)
+        deleted_paths = [path for path in cached_paths if not os.path.exists(path)]
+        with cache_lock:
+            for cached_path in deleted_paths:
+                workbook_cache.pop(cached_path, None)
+
+        if stale_files:
+            # Files are independent, so parse them on all cores, but do not fork
+            # more workers than there are files (often just one changed file)
+            max_workers = min(len(stale_files), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self.read_workbook, f): f for f in stale_files}
+
+                for done, future in enumerate(as_completed(futures), 1):
+                    file_path = futures[future]
+                    filename = os.path.basename(file_path)
+                    progress_placeholder.text(f"📄 Reading: {filename}... ({done}/{len(stale_files)})")
+
+                    try:
+                        workbook = future.result()
+                        with cache_lock:
+                            workbook_cache[file_path] = (signatures[file_path], workbook)
+                    except Exception as e:
+                        with cache_lock:
+                            workbook_cache.pop(file_path, None)
+                        match_counts['unread_files'].append(filename)
+                        st.error(f"Error reading {filename}: {e}")
 
         progress_placeholder.empty()
 
+        # Renamed or deleted workbooks would otherwise keep their Parquet copy forever
+        if self.cache_folder:
+            self.prune_sheet_cache(excel_files)
+
+        with cache_lock:
+            # Take this search's workbooks before another session can evict them
+            workbooks = {f: workbook_cache[f][1] for f in excel_files if f in workbook_cache}
+
+            # Over the limit, drop the oldest parsed files that this search does not use
+            excess = len(workbook_cache) - WORKBOOK_CACHE_MAX_ENTRIES
+            if excess > 0:
+                for cached_path in [path for path in workbook_cache if path not in workbooks][:excess]:
+                    del workbook_cache[cached_path]
+
+        # Scan in folder order so the output does not depend on worker timing
+        files_scanned = 0
+        for file_path in excel_files:
+            if file_path not in workbooks:
+                continue
+
+            workbook = workbooks[file_path]
+            searched_names, row_numbers, matched_contents = self.search_single_excel_file(
+                workbook, search_pattern, automaton, min_cell_length
+            )
+            files_scanned += 1
+            part_number, vidhansabha = workbook[0], workbook[1]
+
+            if first_match_only:
+                # Keep the first match of each name that was not found in an earlier file
+                first_hits = {}
+                for idx, name in enumerate(searched_names):
+                    if name not in found_names and name not in first_hits:
+                        first_hits[name] = idx
+                keep = sorted(first_hits.values())
+                searched_names = [searched_names[idx] for idx in keep]
+                row_numbers = [row_numbers[idx] for idx in keep]
+                matched_contents = [matched_contents[idx] for idx in keep]
+
+            all_results['Searched_Name'].extend(searched_names)
+            all_results['Vidhansabha'].extend([vidhansabha] * len(searched_names))
+            all_results['Part_Number'].extend([part_number] * len(searched_names))
+            all_results['Row_Number'].extend(row_numbers)
+            all_results['Matched_Content'].extend(matched_contents)
+            found_names.update(searched_names)
+
+            if searched_names:
+                match_counts['by_name'].update(searched_names)
+                match_counts['by_part'][part_number] += len(searched_names)
+
+            if first_match_only and len(found_names) == len(findable_names):
+                break
+
         # Add "Not Found" entries for names that weren't found
         not_found_names = set(all_search_names) - found_names
         for name in not_found_names:
-            all_results.append({
-                'Searched_Name': name,
-                'Vidhansabha': 'Not Found',
-                'Part_Number': 'Not Found',
-                'Row_Number': '',
-                'Matched_Content': ''
-            })
+            all_results['Searched_Name'].append(name)
+            all_results['Vidhansabha'].append('Not Found')
+            all_results['Part_Number'].append('Not Found')
+            all_results['Row_Number'].append('')
+            all_results['Matched_Content'].append('')
 
-        return all_results, len(excel_files)
+        return all_results, match_counts, files_scanned
 
     def auto_adjust_column_width(self, worksheet, dataframe):
         """Auto-adjust column widths based on content"""
         for idx, col in enumerate(dataframe.columns):
             max_length = len(str(col))
 
-            # Check content length
-            for value in dataframe[col].astype(str):
-                max_length = max(max_length, len(value))
+            # Check content length (vectorized; an empty frame has no max)
+            if len(dataframe) > 0:
+                max_length = max(max_length, int(dataframe[col].astype(str).str.len().max()))
 
             # Set width with some padding (max 80 chars for readability)
             adjusted_width = min(max_length + 2, 80)
-            worksheet.column_dimensions[chr(65 + idx)].width = adjusted_width
+            worksheet.set_column(idx, idx, adjusted_width)
+
+    def write_sheet(self, workbook, sheet_name, dataframe):
+        """Write a DataFrame row by row so constant_memory mode can flush each row"""
+        worksheet = workbook.add_worksheet(sheet_name)
+        # Same header style pandas' to_excel used: bold, bordered, centred
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        worksheet.write_row(0, 0, list(dataframe.columns), header_format)
+
+        for row_idx, row in enumerate(dataframe.itertuples(index=False, name=None), 1):
+            worksheet.write_row(row_idx, 0, row)
+
+        self.auto_adjust_column_width(worksheet, dataframe)
 
     def sort_results_by_input_order(self, results_df, input_names_list):
         """Sort results to match the input order of names"""
@@ -162,69 +456,169 @@ class NameSearcher:
 
         return results_df
 
-    def create_results_excel(self, results, search_terms_display):
-        """Create Excel file with results - SAME FORMAT AS offline_app.py"""
+    def build_results_frame(self, results, input_names_list):
+        """Build the results DataFrame sorted by input order of names"""
+        results_df = self.sort_results_by_input_order(pd.DataFrame(results), input_names_list)
+
+        # These columns repeat a handful of values on every row; categoricals store
+        # each value once and make the comparisons and nunique() calls work on codes
+        for column in ('Searched_Name', 'Vidhansabha', 'Part_Number'):
+            results_df[column] = results_df[column].astype('category')
+
+        return results_df
+
+    def summarize_by_name(self, name_counts, input_names_list, count_column='Match_Count'):
+        """Match counts per searched name, in input order"""
+        name_order_map = {name: idx for idx, name in enumerate(input_names_list)}
+        name_rows = sorted(name_counts.items(), key=lambda item: name_order_map.get(item[0], len(name_order_map)))
+        return pd.DataFrame(name_rows, columns=['Searched_Name', count_column])
+
+    def summarize_by_part(self, part_counts, count_column='Match_Count'):
+        """Match counts per part number, most matches first (ties by part number)"""
+        part_rows = sorted(sorted(part_counts.items()), key=lambda item: item[1], reverse=True)
+        return pd.DataFrame(part_rows, columns=['Part_Number', count_column])
+
+    def create_results_excel(self, results_df, match_counts, search_terms_display):
+        """Create Excel file with results - SAME FORMAT AS offline_app.py
+
+        results_df is the frame from build_results_frame, which the page has
+        already built for display.
+        """
         output = io.BytesIO()
 
-        results_df = pd.DataFrame(results)
-        # Sort by input order of names
-        results_df = self.sort_results_by_input_order(results_df, search_terms_display)
-
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Sheet 1: Search_Results (all results grouped by name in input order)
-            results_df.to_excel(writer, sheet_name='Search_Results', index=False)
-            worksheet = writer.sheets['Search_Results']
-            self.auto_adjust_column_width(worksheet, results_df)
-
-            # Only create summaries if there are found results
-            if len(results) > 0:
-                found_results = results_df[results_df['Part_Number'] != 'Not Found']
-
-                if len(found_results) > 0:
-                    # Sheet 2: Summary by Name (maintaining input order)
-                    name_summary = found_results.groupby('Searched_Name', sort=False).size().reset_index(name='Match_Count')
-                    # Reorder based on input
-                    name_order_map = {name: idx for idx, name in enumerate(search_terms_display)}
-                    name_summary['_sort_order'] = name_summary['Searched_Name'].map(name_order_map)
-                    name_summary = name_summary.sort_values('_sort_order', kind='stable')
-                    name_summary = name_summary.drop('_sort_order', axis=1)
-                    name_summary.to_excel(writer, sheet_name='Summary_by_Name', index=False)
-                    worksheet_summary = writer.sheets['Summary_by_Name']
-                    self.auto_adjust_column_width(worksheet_summary, name_summary)
-
-                    # Sheet 3: Summary by Part
-                    part_summary = found_results.groupby('Part_Number').size().reset_index(name='Match_Count')
-                    part_summary = part_summary.sort_values('Match_Count', ascending=False)
-                    part_summary.to_excel(writer, sheet_name='Summary_by_Part', index=False)
-                    worksheet_part = writer.sheets['Summary_by_Part']
-                    self.auto_adjust_column_width(worksheet_part, part_summary)
-
-            # Sheet 4: Search_Terms
-            patterns_df = pd.DataFrame({'Search_Terms_Used': search_terms_display})
-            patterns_df.to_excel(writer, sheet_name='Search_Terms', index=False)
-            worksheet_terms = writer.sheets['Search_Terms']
-            self.auto_adjust_column_width(worksheet_terms, patterns_df)
+        # xlsxwriter in constant_memory mode streams rows out instead of holding the
+        # whole workbook in memory. pandas' to_excel writes column by column, which
+        # this mode cannot handle, so rows are written through write_sheet.
+        # Matched cells are plain text, so skip the per-string URL check as well.
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_urls': False})
+
+        # Sheet 1: Search_Results (all results grouped by name in input order)
+        self.write_sheet(workbook, 'Search_Results', results_df)
+
+        # Only create summaries if there are found results
+        if len(match_counts['by_name']) > 0:
+            # Sheet 2: Summary by Name (maintaining input order)
+            name_summary = self.summarize_by_name(match_counts['by_name'], search_terms_display)
+            self.write_sheet(workbook, 'Summary_by_Name', name_summary)
+
+            # Sheet 3: Summary by Part
+            part_summary = self.summarize_by_part(match_counts['by_part'])
+            self.write_sheet(workbook, 'Summary_by_Part', part_summary)
+
+        # Sheet 4: Search_Terms
+        patterns_df = pd.DataFrame({'Search_Terms_Used': search_terms_display})
+        self.write_sheet(workbook, 'Search_Terms', patterns_df)
+
+        workbook.close()
 
         output.seek(0)
-        return output, results_df
+        return output
 
 
 def prepare_search_terms(names):
-    """Prepare regex search terms from names and create mapping"""
+    """Prepare case-insensitive search terms from names and create mapping"""
     search_terms = []
     search_names_map = {}
 
     for name in names:
-        pattern1 = f".*{name}.*"
-        pattern2 = f"(?i).*{name}.*"
-        search_terms.append(pattern1)
-        search_terms.append(pattern2)
-        search_names_map[pattern1] = name
-        search_names_map[pattern2] = name
+        # casefold() rather than lower() so Unicode names compare correctly
+        term = name.casefold()
+        if term not in search_names_map:
+            search_terms.append(term)
+            search_names_map[term] = name
 
     return search_terms, search_names_map
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def list_excel_files(folder, folder_mtime):
+    """List the Excel files in a folder with one directory read.
+
+    folder_mtime is only part of the cache key, so adding or removing files
+    refreshes the list without waiting for the ttl.
+    """
+    with os.scandir(folder) as entries:
+        return sorted(
+            entry.path for entry in entries
+            if entry.is_file() and not entry.name.startswith('.')
+            and entry.name.lower().endswith(('.xlsx', '.xls'))
+        )
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_search(excel_folder, file_signatures, search_names, first_match_only=False):
+    """Search once per (file set, name list) and reuse the results on repeat searches.
+
+    file_signatures holds (path, mtime_ns, size) for every file, so adding,
+    removing or editing a file starts a fresh search. Callers should clear the
+    entry when match_counts['unread_files'] is not empty: a file that could not
+    be read (e.g. locked while open in Excel) may be readable next time with
+    the same signature.
+    """
+    search_terms, search_names_map = prepare_search_terms(search_names)
+    searcher = NameSearcher(excel_folder)
+    return searcher.search_all_excel_files(
+        search_terms,
+        search_names_map,
+        list(search_names),
+        [file_path for file_path, _, _ in file_signatures],
+        first_match_only=first_match_only
+    )
+
+
+def get_file_signatures(excel_files):
+    """Return (path, mtime_ns, size) for each file, used as a cache key for searches"""
+    signatures = []
+    for file_path in excel_files:
+        stat = os.stat(file_path)
+        signatures.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signatures)
+
+
+@st.cache_resource
+def get_workbook_cache():
+    """Parsed workbooks shared across reruns, keyed by path with their (mtime, size)"""
+    return {}
+
+
+@st.cache_resource
+def get_workbook_cache_lock():
+    """Lock guarding get_workbook_cache(), which all sessions share"""
+    return threading.Lock()
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_matchers(search_terms, search_names_map):
+    """Build the search pattern and automaton once per name list and reuse them across searches"""
+    return build_search_pattern(search_terms), build_automaton(search_terms, search_names_map)
+
+
+def build_search_pattern(search_terms):
+    """Combine all search terms into one alternation for vectorized scans of casefolded text.
+
+    Returns None when the alternation is over RE2's compiled size limit (many
+    thousands of names); the search then skips the vectorized pre-filter.
+    """
+    pattern = "|".join(re.escape(term) for term in search_terms)
+    if HAS_PYARROW:
+        try:
+            pd.Series([""], dtype=TEXT_DTYPE).str.contains(pattern)
+        except pyarrow.ArrowInvalid:
+            return None
+    return pattern
+
+
+def build_automaton(search_terms, search_names_map):
+    """Build an Aho-Corasick automaton that matches all search terms in one pass"""
+    automaton = ahocorasick.Automaton()
+
+    for idx, term in enumerate(search_terms):
+        automaton.add_word(term, (idx, search_names_map.get(term, term)))
+
+    automaton.make_automaton()
+    return automaton
+
+
 def main():
     st.set_page_config(
         page_title="Name Search Tool",
@@ -244,7 +638,7 @@ def main():
         st.stop()
 
     # Count files
-    excel_files = glob.glob(os.path.join(EXCEL_FOLDER, "*.xlsx")) + glob.glob(os.path.join(EXCEL_FOLDER, "*.xls"))
+    excel_files = list_excel_files(EXCEL_FOLDER, os.path.getmtime(EXCEL_FOLDER))
 
     if not excel_files:
         st.error(f"❌ No Excel files found in '{EXCEL_FOLDER}' folder!")
@@ -261,12 +655,8 @@ def main():
 
     searcher = NameSearcher(EXCEL_FOLDER)
 
-    if 'search_terms' not in st.session_state:
-        st.session_state.search_terms = None
     if 'search_terms_display' not in st.session_state:
         st.session_state.search_terms_display = []
-    if 'search_names_map' not in st.session_state:
-        st.session_state.search_names_map = {}
     if 'results_data' not in st.session_state:
         st.session_state.results_data = None
     if 'input_filename' not in st.session_state:
@@ -291,10 +681,7 @@ def main():
         if st.sidebar.button("✅ Load Names", type="primary", use_container_width=True):
             if manual_input.strip():
                 lines = [line.strip() for line in manual_input.splitlines() if line.strip()]
-                search_terms, search_names_map = prepare_search_terms(lines)
-                st.session_state.search_terms = search_terms
                 st.session_state.search_terms_display = lines
-                st.session_state.search_names_map = search_names_map
                 st.session_state.results_data = None
                 st.session_state.input_filename = "manual_input"
                 st.sidebar.success(f"✅ {len(lines)} names loaded!")
@@ -310,10 +697,7 @@ def main():
             try:
                 lines = txt_file.read().decode('utf-8').splitlines()
                 lines = [line.strip() for line in lines if line.strip()]
-                search_terms, search_names_map = prepare_search_terms(lines)
-                st.session_state.search_terms = search_terms
                 st.session_state.search_terms_display = lines
-                st.session_state.search_names_map = search_names_map
                 st.session_state.results_data = None
                 st.session_state.input_filename = Path(txt_file.name).stem
                 st.sidebar.success(f"✅ {len(lines)} names loaded!")
@@ -339,10 +723,7 @@ def main():
                     if st.sidebar.button("✅ Load", type="primary", use_container_width=True):
                         values = df[col_idx].dropna().unique()
                         display_names = [str(v).strip() for v in values if str(v).strip()]
-                        search_terms, search_names_map = prepare_search_terms(display_names)
-                        st.session_state.search_terms = search_terms
                         st.session_state.search_terms_display = display_names
-                        st.session_state.search_names_map = search_names_map
                         st.session_state.results_data = None
                         st.session_state.input_filename = Path(excel_input.name).stem
                         st.sidebar.success(f"✅ {len(values)} names loaded!")
@@ -363,10 +744,7 @@ def main():
                             if 0 <= col_idx < num_columns:
                                 values = df[col_idx].dropna().unique()
                                 display_names = [str(v).strip() for v in values if str(v).strip()]
-                                search_terms, search_names_map = prepare_search_terms(display_names)
-                                st.session_state.search_terms = search_terms
                                 st.session_state.search_terms_display = display_names
-                                st.session_state.search_names_map = search_names_map
                                 st.session_state.results_data = None
                                 st.session_state.input_filename = Path(excel_input.name).stem
                                 st.sidebar.success(f"✅ {len(values)} names loaded!")
@@ -379,7 +757,7 @@ def main():
             except Exception as e:
                 st.sidebar.error(f"Error: {e}")
 
-    if st.session_state.search_terms:
+    if st.session_state.search_terms_display:
         st.sidebar.markdown("---")
         st.sidebar.success(f"✅ **{len(st.session_state.search_terms_display)} names ready!**")
 
@@ -388,31 +766,36 @@ def main():
                 st.write(f"{i}. {name}")
 
         if st.sidebar.button("🗑️ Clear", use_container_width=True):
-            st.session_state.search_terms = None
             st.session_state.search_terms_display = []
-            st.session_state.search_names_map = {}
             st.session_state.results_data = None
             st.session_state.input_filename = None
             st.rerun()
 
     # Main area
-    if st.session_state.search_terms:
+    if st.session_state.search_terms_display:
         st.header("🔍 Ready to Search!")
         st.info(f"Will search in {len(excel_files)} Excel files")
 
+        first_match_only = st.checkbox(
+            "⚡ Stop at first match per name",
+            help="Report only the first match of each name and stop searching once every name is found"
+        )
+
         if st.button("🚀 START SEARCH", type="primary", use_container_width=True):
             with st.spinner("Searching..."):
-                results, file_count = searcher.search_all_excel_files(
-                    st.session_state.search_terms,
-                    st.session_state.search_names_map,
-                    st.session_state.search_terms_display
-                )
+                search_args = (EXCEL_FOLDER, get_file_signatures(excel_files), tuple(st.session_state.search_terms_display))
+                results, match_counts, file_count = cached_search(*search_args, first_match_only=first_match_only)
+
+                # Do not keep a result that is missing unreadable files
+                if match_counts is not None and match_counts['unread_files']:
+                    cached_search.clear(*search_args, first_match_only=first_match_only)
 
                 if results is None:
                     st.error(file_count)
                 else:
                     st.session_state.results_data = {
                         'results': results,
+                        'match_counts': match_counts,
                         'file_count': file_count
                     }
                     st.rerun()
@@ -420,15 +803,18 @@ def main():
     # Display results if available
     if st.session_state.results_data:
         results = st.session_state.results_data['results']
+        match_counts = st.session_state.results_data['match_counts']
         file_count = st.session_state.results_data['file_count']
 
         st.markdown("---")
         st.header("📊 Results")
 
-        if results:
-            results_df = pd.DataFrame(results)
-            # Sort by input order of names
-            results_df = searcher.sort_results_by_input_order(results_df, st.session_state.search_terms_display)
+        unread_files = match_counts['unread_files'] if match_counts else []
+        if unread_files:
+            st.warning(f"⚠️ {len(unread_files)} files could not be read and were not searched: {', '.join(unread_files)}")
+
+        if results['Searched_Name']:
+            results_df = searcher.build_results_frame(results, st.session_state.search_terms_display)
 
             found_count = len(results_df[results_df['Part_Number'] != 'Not Found'])
             not_found_count = len(results_df[results_df['Part_Number'] == 'Not Found'])
@@ -450,7 +836,7 @@ def main():
 
             # DOWNLOAD BUTTON AT TOP
             st.markdown("### 📥 Download Results")
-            excel_output, _ = searcher.create_results_excel(results, st.session_state.search_terms_display)
+            excel_output = searcher.create_results_excel(results_df, match_counts, st.session_state.search_terms_display)
             output_filename = f"{st.session_state.input_filename}_output.xlsx"
 
             st.download_button(
@@ -485,26 +871,22 @@ def main():
 
             with col1:
                 st.subheader("📈 Matches by Name")
-                found_results = results_df[results_df['Part_Number'] != 'Not Found']
-                if len(found_results) > 0:
-                    name_summary = found_results.groupby('Searched_Name', sort=False).size().reset_index(name='Matches')
-                    # Reorder based on input
-                    name_order_map = {name: idx for idx, name in enumerate(st.session_state.search_terms_display)}
-                    name_summary['_sort_order'] = name_summary['Searched_Name'].map(name_order_map)
-                    name_summary = name_summary.sort_values('_sort_order', kind='stable')
-                    name_summary = name_summary.drop('_sort_order', axis=1)
+                if len(match_counts['by_name']) > 0:
+                    name_summary = searcher.summarize_by_name(
+                        match_counts['by_name'], st.session_state.search_terms_display, count_column='Matches'
+                    )
                     st.dataframe(name_summary, hide_index=True, use_container_width=True)
 
             with col2:
                 st.subheader("📊 Matches by Part")
-                if len(found_results) > 0:
-                    part_summary = found_results.groupby('Part_Number').size().reset_index(name='Matches')
-                    st.dataframe(part_summary.sort_values('Matches', ascending=False), hide_index=True, use_container_width=True)
+                if len(match_counts['by_part']) > 0:
+                    part_summary = searcher.summarize_by_part(match_counts['by_part'], count_column='Matches')
+                    st.dataframe(part_summary, hide_index=True, use_container_width=True)
 
         else:
             st.warning("❌ No matches found")
 
-    elif not st.session_state.search_terms:
+    elif not st.session_state.search_terms_display:
         st.info("👈 **Please provide names to search (sidebar)**")
         st.markdown("### 📝 How to use:")
         st.markdown("1. Choose input method from sidebar")